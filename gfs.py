@@ -1,19 +1,29 @@
 #!/usr/bin/env python3
 """Grandfather-father-son backup rotation scheme."""
 
-import collections.abc
+import re
 from bisect import bisect
-from datetime import datetime
-from typing import Callable, Coroutine, Hashable, Iterable, Mapping, Union
+from datetime import date as _date, datetime
+from itertools import chain
+from operator import itemgetter, methodcaller
+from sys import intern
+from typing import Callable, Hashable, Iterable, Mapping, Union
 
 
 class Cycle:
-    """A rotation cycle definition."""
+    """A rotation cycle definition.
+
+    The name and key format are not meant to change after creation, as the
+    hash value of the cycle is computed once from them."""
+
+    __slots__ = ('name', 'key_fmt', '_keyfunc', '_hash')
 
     def __init__(self, name: str, datetime_fmt_key: str):
         """Create a named cycle with a datetime format string used as key."""
         self.name = str(name)
         self.key_fmt = str(datetime_fmt_key)
+        self._keyfunc = methodcaller('strftime', self.key_fmt)
+        self._hash = hash((self.name, self.key_fmt))
 
     def __str__(self) -> str:
         """Return an informal string representation of the cycle."""
@@ -32,11 +42,14 @@ class Cycle:
 
     def __hash__(self) -> int:
         """Return the hash value of the cycle object."""
-        return hash((self.name, self.key_fmt))
+        return self._hash
 
     def key(self, date: datetime):
-        """Return the key value for a given datetime object."""
-        return format(date, self.key_fmt)
+        """Return the key value for a given datetime object.
+
+        Keys are interned, so equal keys are mostly the same object and can be
+        compared by identity."""
+        return intern(self._keyfunc(date))
 
 
 # Helper cycles
@@ -46,9 +59,168 @@ MONTHLY = Cycle("monthly", "%Y-%m")
 YEARLY = Cycle("yearly", "%Y")
 
 
+def _same_day(a: datetime, b: datetime) -> bool:
+    """Compare two dates under the DAILY key format, without formatting."""
+    return a.day == b.day and a.month == b.month and a.year == b.year
+
+
+def _same_week(a: datetime, b: datetime) -> bool:
+    """Compare two dates under the WEEKLY key format, without formatting.
+
+    Weeks (%W) start on Monday, and are split at the start of the year.
+
+    >>> _same_week(datetime(2017, 5, 15), datetime(2017, 5, 21))
+    True
+    >>> _same_week(datetime(2017, 5, 14), datetime(2017, 5, 15))
+    False
+    >>> _same_week(datetime(2016, 12, 31), datetime(2017, 1, 1))
+    False
+    """
+    return (a.year == b.year and
+            a.toordinal() - a.weekday() == b.toordinal() - b.weekday())
+
+
+def _same_month(a: datetime, b: datetime) -> bool:
+    """Compare two dates under the MONTHLY key format, without formatting."""
+    return a.month == b.month and a.year == b.year
+
+
+def _same_year(a: datetime, b: datetime) -> bool:
+    """Compare two dates under the YEARLY key format, without formatting."""
+    return a.year == b.year
+
+
+# Comparisons telling whether two dates have the same key for a key format
+_SAME_PERIOD = {
+    DAILY.key_fmt: _same_day,
+    WEEKLY.key_fmt: _same_week,
+    MONTHLY.key_fmt: _same_month,
+    YEARLY.key_fmt: _same_year
+}
+
+# Key formats whose keys are determined by the key of a date in a format: a
+# period of the latter never spans more than one period of the former
+_COARSER_FORMATS = {
+    DAILY.key_fmt: frozenset({DAILY.key_fmt, WEEKLY.key_fmt, MONTHLY.key_fmt,
+                              YEARLY.key_fmt}),
+    WEEKLY.key_fmt: frozenset({WEEKLY.key_fmt, YEARLY.key_fmt}),
+    MONTHLY.key_fmt: frozenset({MONTHLY.key_fmt, YEARLY.key_fmt}),
+    YEARLY.key_fmt: frozenset({YEARLY.key_fmt})
+}
+
+
+# The ISO 8601 date of a date or datetime, a dedicated C method
+_isoformat_date = _date.isoformat
+
+
+def _daily_key(date: datetime) -> str:
+    """Format the DAILY key of a date as its ISO date, without strftime.
+
+    Years before 1000, which strftime doesn't zero-pad, are left to it.
+
+    >>> dates = [datetime(2017, 5, 1), datetime(2017, 1, 1),
+    ...          datetime(999, 1, 1)]
+    >>> all(_daily_key(d) == d.strftime(DAILY.key_fmt) for d in dates)
+    True
+    """
+    if date.year < 1000:
+        return date.strftime(DAILY.key_fmt)
+
+    return _isoformat_date(date)
+
+
+def _weekly_key(date: datetime) -> str:
+    """Format the WEEKLY key of a date from its attributes, without strftime.
+
+    Days before the first Monday of the year are in week 0, as with %W.
+
+    >>> dates = [datetime(2017, 1, 1), datetime(2017, 1, 2),
+    ...          datetime(2018, 12, 31), datetime(2012, 2, 29),
+    ...          datetime(999, 12, 31)]
+    >>> all(_weekly_key(d) == d.strftime(WEEKLY.key_fmt) for d in dates)
+    True
+    """
+    if date.year < 1000:
+        return date.strftime(WEEKLY.key_fmt)
+
+    # Days elapsed in the year, plus the days missing to the next Monday
+    days = date.toordinal() - datetime(date.year, 1, 1).toordinal()
+    return f'{date.year}-{(days + 7 - date.weekday()) // 7:02}'
+
+
+def _monthly_key(date: datetime) -> str:
+    """Format the MONTHLY key of a date from its attributes, without strftime.
+
+    >>> dates = [datetime(2017, 5, 1), datetime(2017, 12, 1),
+    ...          datetime(99, 1, 1)]
+    >>> all(_monthly_key(d) == d.strftime(MONTHLY.key_fmt) for d in dates)
+    True
+    """
+    if date.year < 1000:
+        return date.strftime(MONTHLY.key_fmt)
+
+    return f'{date.year}-{date.month:02}'
+
+
+def _yearly_key(date: datetime) -> str:
+    """Format the YEARLY key of a date from its attributes, without strftime.
+
+    >>> dates = [datetime(2017, 5, 1), datetime(1000, 1, 1),
+    ...          datetime(99, 1, 1)]
+    >>> all(_yearly_key(d) == d.strftime(YEARLY.key_fmt) for d in dates)
+    True
+    """
+    if date.year < 1000:
+        return date.strftime(YEARLY.key_fmt)
+
+    return str(date.year)
+
+
+# Functions formatting the keys of known key formats faster than strftime
+_KEY_FORMATTERS = {
+    DAILY.key_fmt: _daily_key,
+    WEEKLY.key_fmt: _weekly_key,
+    MONTHLY.key_fmt: _monthly_key,
+    YEARLY.key_fmt: _yearly_key
+}
+
+
+# Widths of the strftime directives whose output has a fixed length; %Y is
+# only 4 characters wide from year 1000 onwards, as it's not zero-padded.
+_DIRECTIVE_WIDTHS = {
+    '%Y': 4, '%y': 2, '%m': 2, '%d': 2, '%j': 3, '%U': 2, '%W': 2,
+    '%H': 2, '%I': 2, '%M': 2, '%S': 2, '%%': 1
+}
+
+
+def _key_width(key_fmt: str) -> Union[int, None]:
+    """Return the length of the keys of a format, if it's fixed.
+
+    >>> _key_width('%Y-%m')
+    7
+    >>> _key_width('%Y week %W')
+    12
+    >>> _key_width('%b %Y') is None
+    True
+    """
+    width = 0
+
+    for token in re.findall('%.|.', key_fmt, re.DOTALL):
+        if not token.startswith('%'):
+            width += 1
+        elif token in _DIRECTIVE_WIDTHS:
+            width += _DIRECTIVE_WIDTHS[token]
+        else:
+            return None
+
+    return width
+
+
 class _GFS():
     """Grandfather-father-son backup rotation scheme."""
 
+    __slots__ = ('policies',)
+
     def __init__(self, cycles: Mapping[Cycle, int]):
         """Initialize the GFS class by passing a scheme of policy cycles."""
         self.policies = {}
@@ -72,7 +244,7 @@ class _GFS():
 
     def __hash__(self) -> int:
         """Return the hash of the GFS object."""
-        return hash(self.policies)
+        return hash(frozenset(self.policies.items()))
 
     def _gfs(self,
              dates: Iterable[datetime]) -> Mapping[Cycle, Iterable[datetime]]:
@@ -98,24 +270,146 @@ class _GFS():
          'monthly': ['2017-04-30T16:00:00', '2017-05-21T22:00:00'],
          'weekly': ['2017-05-14T19:00:00', '2017-05-21T22:00:00'],
          'daily': ['2017-05-20T20:00:00', '2017-05-21T22:00:00']}
-        """
-        cycles = {cycle: self._gfs_cycle(cycle) for cycle in self.policies}
 
-        # Prime the coroutine
-        for cycle in cycles.values():
-            cycle.send(None)
+        Cycles overriding Cycle.key are given their own keys:
+
+        >>> class Quarterly(Cycle):
+        ...     def key(self, date):
+        ...         return f'{date.year}-{(date.month - 1) // 3}'
+        >>> months = [datetime(2017, m, 1) for m in range(1, 13)]
+        >>> final = _GFS({Quarterly('quarterly', '%Y'): 2})._gfs(months)
+        >>> [format(d, '%Y-%m-%d') for ds in final.values() for d in ds]
+        ['2017-09-01', '2017-12-01']
+
+        Dates with different UTC offsets are selected by their local dates:
+
+        >>> fmt = '%Y-%m-%dT%H:%M:%S%z'
+        >>> raw = ['2017-02-28T21:00:00-1100',
+        ...        '2017-02-23T09:00:00+1000',  # Earlier than the one below
+        ...        '2017-02-22T19:00:00-0900']
+        >>> dates = [datetime.strptime(d, fmt) for d in raw]
+        >>> final = _GFS({DAILY: 2})._gfs(dates)
+        >>> [format(d, fmt) for ds in final.values() for d in ds]
+        ['2017-02-23T09:00:00+1000', '2017-02-28T21:00:00-1100']
+
+        Of equal dates in the same period, the last one given is kept:
+
+        >>> raw = ['2017-02-01T12:00:00+0000', '2017-02-01T01:00:00-1100']
+        >>> dates = [datetime.strptime(d, fmt) for d in raw]
+        >>> final = _GFS({DAILY: 2})._gfs(dates)
+        >>> [format(d, fmt) for ds in final.values() for d in ds]
+        ['2017-02-01T01:00:00-1100']
+
+        Dates without a time are selected as well:
+
+        >>> days = [datetime(2017, 5, d).date() for d in range(1, 28)]
+        >>> final = _GFS({DAILY: 2, WEEKLY: 2})._gfs(days)
+        >>> {str(c): [d.isoformat() for d in ds] for c, ds in final.items()}
+        ...     # doctest: +NORMALIZE_WHITESPACE
+        {'daily': ['2017-05-26', '2017-05-27'],
+         'weekly': ['2017-05-21', '2017-05-27']}
+        """
+        sets = {cycle: SortedLimitedSet(value, key=cycle.key)
+                for cycle, value in self.policies.items()}
+
+        # Cycles overriding Cycle.key compute their own keys from each date
+        custom = tuple((cycle.key, cycle_set.prepend_monotonic)
+                       for cycle, cycle_set in sets.items()
+                       if type(cycle).key is not Cycle.key)
+
+        # Cycles sharing a key format share the formatted key of each date;
+        # for known formats, it's only formatted again when the period of
+        # the previous date rolls over
+        formats = sorted({cycle.key_fmt for cycle in sets
+                          if type(cycle).key is Cycle.key},
+                         key=len, reverse=True)
+        plan = []
+
+        for fmt in formats:
+            # Keys of a fixed-width format that is a prefix of another one
+            # (e.g. "%Y-%m" of "%Y-%m-%d") are sliced from the longer key,
+            # which is computed first
+            width = _key_width(fmt)
+            source = None
+
+            if width is not None:
+                source = next((other for other in formats
+                               if other != fmt and other.startswith(fmt)),
+                              None)
+
+            make = _KEY_FORMATTERS.get(fmt, methodcaller('strftime', fmt))
+            plan.append((fmt, _SAME_PERIOD.get(fmt), source, width, make))
+
+        # Go through the dates from the latest one: the first date of a key in
+        # a cycle is then the one to keep, and the keys of the cycles are
+        # (mostly) monotonic, so they can be prepended. Equal dates are gone
+        # through from the last one given, which is the one kept.
+        dates = sorted(dates)
+        dates.reverse()
+
+        # When the periods of every cycle are made of whole periods of one of
+        # them (e.g. days), only the latest date of each of these can be
+        # selected, and the other ones are skipped
+        finest = next((fmt for fmt in formats
+                       if set(formats) <= _COARSER_FORMATS.get(fmt, set())),
+                      None)
+        skip = _SAME_PERIOD.get(finest) if not custom else None
+
+        keys = {}
+        previous = None
+
+        # Resolve the key format and insertion method of every cycle set once,
+        # rather than on every date. The sets of known key formats are
+        # complete once full, as their keys only decrease from then on;
+        # years before 1000 are not zero-padded, so their keys are not sorted,
+        # and neither are the local dates of different UTC offsets. The sets
+        # that can complete are kept along, the other ones are None.
+        complete = (bool(dates) and dates[-1].year >= 1000 and
+                    (getattr(dates[0], 'tzinfo', None) is None or
+                     len(set(map(datetime.utcoffset, dates))) == 1))
+        pending = tuple((cycle.key_fmt, cycle_set.prepend_monotonic,
+                         (cycle_set if complete and
+                          cycle.key_fmt in _SAME_PERIOD else None))
+                        for cycle, cycle_set in sets.items()
+                        if type(cycle).key is Cycle.key)
 
-        # Pass all the dates to this policy cycle
         for date in dates:
-            for cycle in cycles.values():
-                cycle.send(date)
+            if skip and previous and skip(date, previous):
+                continue
+
+            rolled = False
+
+            for fmt, same, source, width, make in plan:
+                if same and previous and same(date, previous):
+                    continue
 
-        # Finalise by sending None, retrieving the selected values
-        selected = {}
-        for name, cycle in cycles.items():
-            selected[name] = iter(cycle.send(None))
+                rolled = rolled or same is not None
 
-        return selected
+                # Years before 1000 make the widths vary, always format them
+                if source is None or date.year < 1000:
+                    keys[fmt] = intern(make(date))
+                else:
+                    keys[fmt] = intern(keys[source][:width])
+
+            previous = date
+
+            for fmt, prepend, _ in pending:
+                prepend(date, keys[fmt])
+
+            for key, prepend in custom:
+                prepend(date, key(date))
+
+            # Stop feeding complete cycle sets, and stop altogether once all
+            # of them are complete
+            if rolled:
+                pending = tuple((fmt, prepend, cycle_set)
+                                for fmt, prepend, cycle_set in pending
+                                if cycle_set is None or not cycle_set.full)
+
+                if not pending and not custom:
+                    break
+
+        return {cycle: cycle_set.list for cycle, cycle_set in sets.items()}
 
     def gfs_filter(self, dates: Iterable[datetime]) -> Iterable[datetime]:
         """Filter a list of candidate dates, returning the selected ones.
@@ -141,31 +435,131 @@ class _GFS():
         """
         selected = self._gfs(dates)
 
-        filtered = set()  # Type: Set[datetime]
-        for elems in selected.values():
-            filtered.update(elems)
+        # Cycles mostly select the same dates; deduplicate them in one pass
+        return set(chain.from_iterable(selected.values()))
+
+
+# Regular expressions of the strptime directives handled by the parsers built
+# by _date_parser, named after the datetime arguments they set
+_PARSER_DIRECTIVES = {
+    '%Y': '(?P<year>[0-9]{4})',
+    '%m': '(?P<month>[0-9]{2})',
+    '%d': '(?P<day>[0-9]{2})',
+    '%H': '(?P<hour>[0-9]{2})',
+    '%M': '(?P<minute>[0-9]{2})',
+    '%S': '(?P<second>[0-9]{2})'
+}
+# Default datetime arguments when missing from the format, as with strptime,
+# in the order datetime takes them
+_PARSER_DEFAULTS = {
+    'year': 1900, 'month': 1, 'day': 1, 'hour': 0, 'minute': 0, 'second': 0
+}
+
+
+def _date_parser(date_format: str) -> Callable[[str, str], datetime]:
+    """Build a date parser for a format, faster than datetime.strptime.
+
+    Formats made of zero-padded numeric directives and literals are compiled
+    into a regular expression. Dates which don't strictly match it (e.g. with
+    unpadded fields), or which are out of range, are handed over to
+    strptime, so that both the accepted dates and the reported errors stay
+    the same. strptime itself is returned for any other format.
+
+    >>> fmt = '%d/%m/%Y %H:%M'
+    >>> parse = _date_parser(fmt)
+    >>> parse('21/05/2017 22:00', fmt)
+    datetime.datetime(2017, 5, 21, 22, 0)
+    >>> parse('21/5/2017 22:00', fmt)
+    datetime.datetime(2017, 5, 21, 22, 0)
+    >>> parse('30/02/2017 22:00', fmt)
+    Traceback (most recent call last):
+    ValueError: day is out of range for month
+    >>> _date_parser('%H:%M')('22:05', '%H:%M')
+    datetime.datetime(1900, 1, 1, 22, 5)
+    >>> _date_parser('%b %d %Y') == datetime.strptime
+    True
+    """
+    pattern = []
+
+    for token in re.findall('%.|.', date_format, re.DOTALL):
+        if token in _PARSER_DIRECTIVES:
+            regex = _PARSER_DIRECTIVES[token]
+
+            # Formats setting a field twice are left to strptime
+            if regex in pattern:
+                return datetime.strptime
+
+            pattern.append(regex)
+        elif token == '%%':
+            pattern.append('%')
+        elif token.startswith('%'):
+            return datetime.strptime
+        else:
+            pattern.append(re.escape(token))
+
+    date_re = re.compile(''.join(pattern))
+
+    # The values of the groups are followed by the defaults of the datetime
+    # arguments missing from the format, up to the last one it sets (year,
+    # month and day are always needed). When the format doesn't set them in
+    # argument order, a getter built here reorders them for datetime.
+    fields = sorted(date_re.groupindex, key=date_re.groupindex.get)
+    args = list(_PARSER_DEFAULTS)
+    args = args[:max([3] + [args.index(field) + 1 for field in fields])]
+    missing = [arg for arg in args if arg not in fields]
 
-        return filtered
+    defaults = tuple(_PARSER_DEFAULTS[arg] for arg in missing)
+    order = [(fields + missing).index(arg) for arg in args]
+    reorder = itemgetter(*order) if order != sorted(order) else None
 
-    # Aaargh, 80 cols!
-    _Gfs_cycle_ret = Coroutine[None, Union[datetime, None], Iterable]
+    def parse(date_string: str, date_format: str) -> datetime:
+        """Parse a date, falling back to datetime.strptime."""
+        match = date_re.fullmatch(date_string)
 
-    def _gfs_cycle(self, cycle: Cycle) -> _Gfs_cycle_ret:
-        """Coroutine that evaluates every candidate sent, under this cycle."""
-        cycle_set = SortedLimitedSet(self.policies[cycle], key=cycle.key)
+        if match is not None:
+            values = (*map(int, match.groups()), *defaults)
 
-        date = yield
-        while date:
-            cycle_set.insert(date)
-            date = yield
+            try:
+                if reorder is None:
+                    return datetime(*values)
 
-        yield iter(cycle_set)
-        return
+                return datetime(*reorder(values))
+            except ValueError:
+                pass
+
+        return datetime.strptime(date_string, date_format)
+
+    return parse
+
+
+def _format_iso_datetime(date: datetime, date_format: str) -> str:
+    """Format a date as "%Y-%m-%dT%H:%M:%S" faster than format/strftime.
+
+    Years before 1000 are left to strftime, which doesn't zero-pad them.
+
+    >>> fmt = '%Y-%m-%dT%H:%M:%S'
+    >>> _format_iso_datetime(datetime(2017, 5, 21, 22, 0, 0, 500), fmt)
+    '2017-05-21T22:00:00'
+    >>> _format_iso_datetime(datetime(999, 5, 21, 22), fmt)
+    '999-05-21T22:00:00'
+    """
+    if date.year < 1000:
+        return format(date, date_format)
+
+    return date.isoformat('T', 'seconds')
+
+
+# Date formatters specialised for a given format, with the signature of format
+_DATE_FORMATTERS = {
+    '%Y-%m-%dT%H:%M:%S': _format_iso_datetime
+}
 
 
 class GFS(_GFS):
     """Lax implementation of GFS, allowing for string cycles and dates."""
 
+    __slots__ = ('fmt', '_strptime', '_strftime')
+
     # Named keyword cycles
     KEYWORD_CYCLES = {
         'daily': DAILY,
@@ -186,6 +580,8 @@ class GFS(_GFS):
                  **kwargs: Mapping[str, int]):
         """Create a Grandfather-father-son backup rotation scheme helper."""
         self.fmt = date_format
+        self._strptime = _date_parser(date_format)
+        self._strftime = _DATE_FORMATTERS.get(date_format, format)
 
         if cycles is None and kwargs:
             cycles = GFS.parse_keyword_cycles(**kwargs)
@@ -253,8 +649,11 @@ class GFS(_GFS):
         """
         # Conver the string dates to datetime objects, passing them to the main
         # GFS implementation, and then convert them back using the same format.
-        result = super()._gfs(self._str_to_date(dates))
-        return {c: list(self._date_to_str(s)) for c, s in result.items()}
+        parse, strftime, fmt = self._parse_date, self._strftime, self.fmt
+
+        # Repeated dates can't change the selection, only parse them once
+        result = super()._gfs([parse(d) for d in dict.fromkeys(dates)])
+        return {c: [strftime(d, fmt) for d in s] for c, s in result.items()}
 
     def _parse_date(self, str_date: str) -> datetime:
         """Parse a string date to a datetime object.
@@ -265,25 +664,13 @@ class GFS(_GFS):
         Unfortunately it will repeat the date in other cases, such as "time
         data '...' does not match format '...'"."""
         try:
-            return datetime.strptime(str_date, self.fmt)
+            return self._strptime(str_date, self.fmt)
         except ValueError as e:
             msg = f"Invalid date {str_date}: {e}."
             raise ValueError(msg) from e
 
-    def _str_to_date(self, str_dates: Iterable[str]) -> Iterable[datetime]:
-        """A generator that yields datetime from strings."""
-        yield from map(self._parse_date, str_dates)
-
-    def _format_date(self, date: datetime) -> str:
-        """Format a datetime object into a string date."""
-        return format(date, self.fmt)
 
-    def _date_to_str(self, dates: Iterable[datetime]) -> Iterable[str]:
-        """A generator that yields strings from datetime."""
-        yield from map(self._format_date, dates)
-
-
-class SortedLimitedList(collections.abc.Iterable):
+class SortedLimitedList:
     """A sorted list of limited size.
 
     >>> s = SortedLimitedList(3, [20, 10])
@@ -329,38 +716,62 @@ class SortedLimitedList(collections.abc.Iterable):
     [20, 30, 40]
     """
 
+    __slots__ = ('max_size', 'key', 'list', 'keys', '_has_key')
+
     def __init__(self, max_size: int, iterable: Iterable[Hashable] = None,
                  key: Union[Callable, None] = None):
         """Initialize the SortedLimitedList."""
         self.max_size = max_size
-        self.key = key if callable(key) else (lambda v: v)
+        # Without a key function, values are their own keys; avoid calling an
+        # identity function on every insert
+        self._has_key = callable(key)
+        self.key = key if self._has_key else None
 
+        # Values are also their keys without a key function, so the list is
+        # then bisected directly rather than maintained twice
         self.list = []
-        self.keys = []
+        self.keys = [] if self._has_key else self.list
 
         if iterable:
             for elem in iterable:
                 self.insert(elem)
 
-    def insert(self, value, *, _key=None, _index: int = None) -> None:
+    def insert(self, value) -> None:
         """Insert a new value into the list."""
-        key = _key or self.key(value)
-        idx = _index or bisect(self.keys, key)
+        key = self.key(value) if self._has_key else value
+        self._insert_known(value, key, bisect(self.keys, key))
 
-        # When the list is at maximum size, and this element would be inserted
-        # at the head of the list (index = 0), skip adding it altogether.
-        if idx != 0 or len(self.keys) < self.max_size:
-            self.keys.insert(idx, key)
+    def _insert_known(self, value, key, idx: int) -> None:
+        """Insert a value, given its key and its index in the list."""
+        if len(self.list) < self.max_size:
             self.list.insert(idx, value)
-
-            # Remove the extraneous elements
-            if len(self.keys) > self.max_size:
-                del self.keys[0]
-                del self.list[0]
+            if self._has_key:
+                self.keys.insert(idx, key)
+        elif idx != 0:
+            # When the list is at maximum size, drop its head by shifting the
+            # elements before the insertion point down one position, in place.
+            # Elements that would be inserted at the head of the list
+            # (index = 0) are skipped altogether.
+            self.list[:idx - 1] = self.list[1:idx]
+            self.list[idx - 1] = value
+            if self._has_key:
+                self.keys[:idx - 1] = self.keys[1:idx]
+                self.keys[idx - 1] = key
+
+    @property
+    def full(self) -> bool:
+        """Whether the list is at maximum size.
+
+        >>> SortedLimitedList(2, [10]).full
+        False
+        >>> SortedLimitedList(2, [10, 20, 30]).full
+        True
+        """
+        return len(self.list) >= self.max_size
 
     def __iter__(self) -> Iterable:
-        """Generate an iterable for this list."""
-        yield from self.list
+        """Return an iterator for this list."""
+        return iter(self.list)
 
     def __repr__(self) -> str:
         """Compute the string representation of this list."""
@@ -398,19 +809,68 @@ class SortedLimitedSet(SortedLimitedList):
     >>> s
     [20, 30, 40]"""
 
+    __slots__ = ()
+
     def insert(self, value) -> None:
         """Insert a new value into the set."""
-        key = self.key(value)
+        key = self.key(value) if self._has_key else value
+        self.insert_with_key(value, key)
+
+    def insert_with_key(self, value, key) -> None:
+        """Insert a new value into the set, with its key already computed.
+
+        >>> s = SortedLimitedSet(2, key=len)
+        >>> s.insert_with_key('ab', 2)
+        >>> s.insert_with_key('cd', 2)
+        >>> s.insert_with_key('e', 1)
+        >>> s
+        ['e', 'cd']
+        """
         idx = bisect(self.keys, key)
 
-        ex_key = self.keys[idx - 1] if idx > 0 else None
-        if ex_key is not None and ex_key == key:
+        if idx > 0 and self.keys[idx - 1] == key:
             # Key collision, compare raw values and substitute if greater;
             # ignore value otherwise
             if value >= self.list[idx - 1]:
                 self.list[idx - 1] = value
         else:
-            super().insert(value, _key=key, _index=idx)
+            self._insert_known(value, key, idx)
+
+    def prepend_monotonic(self, value, key) -> None:
+        """Insert a value whose key is expected to be the lowest in the set.
+
+        Values must be inserted in descending order: the first value of a key
+        is then the greatest one and is kept, so later values with the same
+        key, and lower keys once the set is full, are skipped without
+        bisecting. Keys greater than the first one are bisected.
+
+        >>> s = SortedLimitedSet(3)
+        >>> for v in [40, 30, 30, 20, 10]:
+        ...     s.prepend_monotonic(v, v)
+        >>> s
+        [20, 30, 40]
+        >>> s.prepend_monotonic(35, 35)
+        >>> s
+        [30, 35, 40]
+        """
+        keys = self.keys
+
+        # Consecutive sorted values mostly share the same key, so a collision
+        # with the first key is checked first
+        if keys and key == keys[0]:
+            # Key collision, the value kept is not lower
+            return
+
+        if not keys or key < keys[0]:
+            if len(keys) < self.max_size:
+                self.list.insert(0, value)
+                if self._has_key:
+                    keys.insert(0, key)
+        else:
+            idx = bisect(keys, key)
+
+            if keys[idx - 1] != key:
+                self._insert_known(value, key, idx)
 
 
 def main():